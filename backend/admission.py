@@ -0,0 +1,185 @@
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Tuple
+
+# Lower value is served first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 1
+
+
+class Overloaded(Exception):
+    """Raised when the wait queue is full and the request is shed immediately"""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Server is overloaded")
+        self.retry_after = retry_after
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a request could not finish before its deadline"""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Request deadline exceeded")
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Bounded worker pool with a priority wait queue and per-request deadlines.
+
+    Blocking work (encoding, FAISS, re-indexing) runs on a fixed thread pool.
+    Interactive requests beyond max_queue waiters are rejected straight away.
+    Background jobs only get a free worker when no interactive request is
+    waiting, until they have waited background_max_wait_s; after that they
+    queue ahead of interactive requests that arrived later.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 4,
+        max_queue: int = 16,
+        default_deadline_ms: float = 2000,
+        background_max_wait_s: float = 5.0
+    ):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.default_deadline_ms = default_deadline_ms
+        self.background_max_wait_s = background_max_wait_s
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="search-worker")
+        self._free_slots = max_workers
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        # Interactive requests admitted and not yet finished (queued or running)
+        self._inflight = 0
+        # Moving average of interactive service time, used for Retry-After
+        self._service_time_s = 0.1
+        # Created on first use, inside the running event loop
+        self._background_lock: Optional[asyncio.Lock] = None
+
+    @property
+    def queue_depth(self) -> int:
+        return max(0, self._inflight - self.busy_workers)
+
+    @property
+    def busy_workers(self) -> int:
+        return self.max_workers - self._free_slots
+
+    def retry_after(self) -> int:
+        """Seconds a rejected client should wait, from queue depth and service time"""
+        backlog = self.queue_depth + self.busy_workers
+        return max(1, math.ceil(backlog * self._service_time_s / self.max_workers))
+
+    def deadline(self, deadline_ms: Optional[float] = None) -> float:
+        """Absolute time.monotonic() deadline for a request starting now"""
+        if deadline_ms is None:
+            deadline_ms = self.default_deadline_ms
+        return time.monotonic() + deadline_ms / 1000
+
+    async def run(self, fn: Callable, *args, deadline: Optional[float] = None):
+        """Run an interactive request, or raise Overloaded / DeadlineExceeded
+
+        deadline is absolute (time.monotonic()), so queueing time counts against it.
+        fn should check it too and raise TimeoutError once it has passed, so a
+        request that was already answered with a 503 stops holding its worker.
+        """
+        if self._inflight >= self.max_workers + self.max_queue:
+            raise Overloaded(self.retry_after())
+
+        self._inflight += 1
+        try:
+            if deadline is None:
+                deadline = self.deadline()
+            try:
+                await asyncio.wait_for(self._acquire(PRIORITY_INTERACTIVE), deadline - time.monotonic())
+            except asyncio.TimeoutError:
+                raise DeadlineExceeded(self.retry_after())
+            if time.monotonic() >= deadline:
+                # Got a worker too late to do anything useful with it
+                self._release()
+                raise DeadlineExceeded(self.retry_after())
+
+            started = time.monotonic()
+            future = self._submit(fn, *args)
+            try:
+                result = await asyncio.wait_for(asyncio.shield(future), deadline - time.monotonic())
+            except (asyncio.TimeoutError, TimeoutError):
+                # Either fn gave up at the deadline (TimeoutError) or it is still
+                # running; it keeps its worker until the thread actually finishes
+                raise DeadlineExceeded(self.retry_after())
+            self._service_time_s = 0.8 * self._service_time_s + 0.2 * (time.monotonic() - started)
+            return result
+        finally:
+            self._inflight -= 1
+
+    def background_lock(self) -> asyncio.Lock:
+        """Lock that serializes background jobs.
+
+        Hold it around the whole job, including any file changes the job
+        reads, so at most one background job is queued or running.
+        """
+        if self._background_lock is None:
+            self._background_lock = asyncio.Lock()
+        return self._background_lock
+
+    async def run_background(self, fn: Callable, *args):
+        """Run low-priority work such as re-indexing; never shed, no deadline.
+
+        Callers hold background_lock() while this runs.
+        """
+        await self._acquire(PRIORITY_BACKGROUND, promote_after=self.background_max_wait_s)
+        return await self._submit(fn, *args)
+
+    async def _acquire(self, priority: int, promote_after: Optional[float] = None):
+        if self._free_slots > 0 and not self._waiters:
+            self._free_slots -= 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        entry = (priority, next(self._sequence), waiter)
+        heapq.heappush(self._waiters, entry)
+        try:
+            if promote_after is not None:
+                await asyncio.wait({waiter}, timeout=promote_after)
+                if not waiter.done():
+                    # Aging: keep the original sequence number so the job goes
+                    # ahead of interactive requests that arrived after it
+                    self._waiters.remove(entry)
+                    entry = (PRIORITY_INTERACTIVE, entry[1], waiter)
+                    self._waiters.append(entry)
+                    heapq.heapify(self._waiters)
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Slot was handed over just as we gave up: pass it on
+                self._release()
+            elif entry in self._waiters:
+                self._waiters.remove(entry)
+                heapq.heapify(self._waiters)
+            raise
+
+    def _submit(self, fn: Callable, *args) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._executor, fn, *args)
+        future.add_done_callback(self._on_done)
+        return future
+
+    def _on_done(self, future: asyncio.Future):
+        # Results of abandoned requests are never awaited; fetching the
+        # exception keeps asyncio from logging it as unretrieved
+        if not future.cancelled():
+            future.exception()
+        self._release()
+
+    def _release(self):
+        # Hand the slot straight to the highest-priority waiter
+        while self._waiters:
+            _, _, waiter = heapq.heappop(self._waiters)
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._free_slots += 1
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
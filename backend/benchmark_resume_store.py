@@ -0,0 +1,158 @@
+"""
+Script to measure process RSS of ResumeStore against the old list-of-dicts
+layout on a large synthetic corpus (Linux only, reads /proc)
+Each layout is built in a fresh child process
+Run: python benchmark_resume_store.py [num_resumes] [words_per_resume] [blob_dir]
+"""
+
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+
+from resume_store import ResumeStore
+
+SKILLS = [
+    'python', 'java', 'javascript', 'react', 'node.js', 'typescript', 'sql',
+    'aws', 'docker', 'kubernetes', 'git', 'agile', 'machine learning', 'devops'
+]
+WORDS = (
+    "engineer developer tested designed implemented automation selenium api "
+    "services team delivered improved performance scalable backend frontend "
+    "quality assurance requirements university degree project experience"
+).split()
+RESUMES_DIR = os.path.join("..", "resumes")
+
+
+def synthetic_resume(i, words_per_resume, rng):
+    text = " ".join(rng.choice(WORDS) for _ in range(words_per_resume))
+    filename = f"Candidate_{i:06d}_SE.pdf"
+    info = {
+        'name': f"Candidate {i}",
+        'email': f"candidate{i}@example.com",
+        'phone': f"077{i:07d}",
+        'skills': rng.sample(SKILLS, 5),
+        'experience_summary': f"{rng.randint(1, 15)} years of experience | Recent role: Software Engineer",
+        'full_text': text
+    }
+    # Skills are stored in vocabulary order, as extract_candidate_info returns them
+    info['skills'] = [s for s in SKILLS if s in info['skills']]
+    return filename, info
+
+
+def rss_bytes():
+    """Current resident set size of this process (Linux /proc)"""
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) * 1024
+    raise RuntimeError("VmRSS not available; run on Linux")
+
+
+def filesystem_type(path):
+    """Filesystem type of the mount holding path, e.g. 'ext4' or 'tmpfs'"""
+    path = os.path.realpath(path)
+    best, fs_type = "", "unknown"
+    with open("/proc/mounts") as mounts:
+        for line in mounts:
+            _, mount_point, mount_type = line.split()[:3]
+            if path.startswith(mount_point) and len(mount_point) > len(best):
+                best, fs_type = mount_point, mount_type
+    return fs_type
+
+
+def corpus(num_resumes, words_per_resume):
+    rng = random.Random(42)
+    for i in range(num_resumes):
+        yield synthetic_resume(i, words_per_resume, rng)
+
+
+def build_dicts(num_resumes, words_per_resume):
+    resumes = []
+    for filename, info in corpus(num_resumes, words_per_resume):
+        resumes.append({
+            'id': filename.replace('.pdf', ''),
+            'path': os.path.join(RESUMES_DIR, filename),
+            'filename': filename,
+            **info
+        })
+    return resumes
+
+
+def build_store(num_resumes, words_per_resume, blob_dir):
+    store = ResumeStore(SKILLS, blob_dir=blob_dir)
+    for filename, info in corpus(num_resumes, words_per_resume):
+        store.append(os.path.join(RESUMES_DIR, filename), info)
+    store.seal()
+    return store
+
+
+def measure_child(layout, num_resumes, words_per_resume, blob_dir):
+    """Runs in a fresh process so each layout starts from the same baseline RSS"""
+    before = rss_bytes()
+    if layout == "dicts":
+        container = build_dicts(num_resumes, words_per_resume)
+        built = rss_bytes()
+        touched = built
+    else:
+        container = build_store(num_resumes, words_per_resume, blob_dir)
+        built = rss_bytes()
+        # Reading every text faults all blob pages into the mapping
+        for idx in range(len(container)):
+            container.get_text(idx)
+        touched = rss_bytes()
+    print(json.dumps({"built": built - before, "touched": touched - before}))
+
+
+def measure(layout, num_resumes, words_per_resume, blob_dir):
+    output = subprocess.run(
+        [sys.executable, __file__, "--child", layout, str(num_resumes),
+         str(words_per_resume), blob_dir],
+        check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output)
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        measure_child(sys.argv[2], int(sys.argv[3]), int(sys.argv[4]), sys.argv[5])
+        return
+
+    num_resumes = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    words_per_resume = int(sys.argv[2]) if len(sys.argv) > 2 else 600
+    blob_dir = sys.argv[3] if len(sys.argv) > 3 else tempfile.gettempdir()
+
+    # Same records must come back from both layouts
+    sample = min(num_resumes, 200)
+    dicts = build_dicts(sample, words_per_resume)
+    store = build_store(sample, words_per_resume, blob_dir)
+    for idx in range(sample):
+        assert dict(store[idx]) == dicts[idx], f"record {idx} differs"
+    store.close()
+
+    dict_rss = measure("dicts", num_resumes, words_per_resume, blob_dir)
+    store_rss = measure("store", num_resumes, words_per_resume, blob_dir)
+    blob_bytes = sum(len(info['full_text'].encode('utf-8'))
+                     for _, info in corpus(num_resumes, words_per_resume))
+    fs_type = filesystem_type(blob_dir)
+
+    mib = 2 ** 20
+    # A blob on tmpfs lives in RAM even when it is not mapped
+    in_ram = fs_type in ("tmpfs", "ramfs")
+    store_bytes = store_rss['built'] + (blob_bytes if in_ram else 0)
+    print(f"Resumes: {num_resumes}, words per resume: {words_per_resume}")
+    print(f"Text blob: {blob_bytes / mib:.1f} MiB in {blob_dir} ({fs_type})")
+    print(f"List of dicts RSS:              {dict_rss['built'] / mib:8.1f} MiB")
+    print(f"ResumeStore RSS after build:    {store_rss['built'] / mib:8.1f} MiB")
+    print(f"ResumeStore RSS, all text read: {store_rss['touched'] / mib:8.1f} MiB")
+    if in_ram:
+        print(f"ResumeStore RSS + {fs_type} blob:  {store_bytes / mib:8.1f} MiB "
+              "(pass a disk-backed blob_dir to avoid this)")
+    else:
+        print("Mapped blob pages are file-backed page cache the kernel can reclaim")
+    print(f"Saving after build:             {100 * (1 - store_bytes / dict_rss['built']):8.1f}%")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Script to calibrate DEDUP_EMAIL_MIN_COSINE for the sentence encoder in use
+Encodes the resumes in a folder, then compares the embedding cosine of
+resumes sharing an email (assumed same candidate) with the highest cosine
+between resumes of different candidates
+Run: python calibrate_dedup.py [resumes_dir]
+"""
+
+import itertools
+import os
+import sys
+
+import numpy as np
+
+from resume_processor import ResumeProcessor
+
+
+def main():
+    resumes_dir = sys.argv[1] if len(sys.argv) > 1 else os.path.join("..", "resumes")
+    processor = ResumeProcessor()
+
+    filenames, texts, emails = [], [], []
+    for filename in sorted(os.listdir(resumes_dir)):
+        if not filename.endswith('.pdf'):
+            continue
+        text = processor.extract_text_from_pdf(os.path.join(resumes_dir, filename))
+        if not text.strip():
+            continue
+        filenames.append(filename)
+        texts.append(text)
+        emails.append((processor.extract_candidate_info(text, filename)['email'] or '').lower())
+
+    embeddings = processor.model.encode(texts)
+    unit = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+
+    same, different = [], []
+    for first, second in itertools.combinations(range(len(texts)), 2):
+        cosine = float(np.dot(unit[first], unit[second]))
+        pair = (cosine, filenames[first], filenames[second])
+        if emails[first] and emails[first] == emails[second]:
+            same.append(pair)
+        else:
+            different.append(pair)
+    different.sort(reverse=True)
+
+    print(f"Resumes: {len(texts)}, pairs: {len(same) + len(different)}")
+    print("Same email (same candidate):")
+    for cosine, first, second in sorted(same):
+        print(f"  {cosine:.3f}  {first} / {second}")
+    print("Highest cosine between different candidates:")
+    for cosine, first, second in different[:5]:
+        print(f"  {cosine:.3f}  {first} / {second}")
+
+    if not same or not different:
+        print("Need same-email and different-candidate pairs to calibrate")
+        return
+    lowest_same = min(cosine for cosine, _, _ in same)
+    highest_different = different[0][0]
+    if lowest_same > highest_different:
+        print(f"Suggested DEDUP_EMAIL_MIN_COSINE={(lowest_same + highest_different) / 2:.2f}")
+    else:
+        print("Same-candidate and different-candidate cosines overlap; "
+              "leave DEDUP_EMAIL_MIN_COSINE unset")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+import re
+import zlib
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+# Smallest prime above 2**32, so hashed shingles stay below it
+_PRIME = np.uint64(4294967311)
+
+
+class DuplicateDetector:
+    """Groups near-duplicate resumes without comparing every pair.
+
+    MinHash signatures over word shingles are bucketed with LSH bands; only
+    documents that share a bucket (or an email address) become candidate
+    pairs, which are then confirmed with the estimated Jaccard similarity and
+    the cosine similarity of their embeddings.
+    """
+
+    def __init__(
+        self,
+        num_perm: int = 128,
+        bands: int = 32,
+        shingle_size: int = 5,
+        jaccard_threshold: float = 0.6,
+        embedding_threshold: float = 0.9,
+        min_jaccard_with_embedding: float = 0.3,
+        email_embedding_threshold: Optional[float] = None,
+        max_bucket_size: int = 50,
+        seed: int = 42
+    ):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.jaccard_threshold = jaccard_threshold
+        self.embedding_threshold = embedding_threshold
+        self.min_jaccard_with_embedding = min_jaccard_with_embedding
+        # Variants sent by one candidate (SE vs QA) are reworded, so their
+        # shingles barely overlap; a shared email is the main evidence and
+        # the embedding only guards against shared inboxes. The cosine level
+        # depends on the encoder, so this rule is off until a threshold is
+        # calibrated for it (see calibrate_dedup.py)
+        self.email_embedding_threshold = email_embedding_threshold
+        # Huge buckets (boilerplate text) would bring back quadratic work
+        self.max_bucket_size = max_bucket_size
+
+        rng = np.random.RandomState(seed)
+        # Coefficients below 2**31 keep a * x + b inside uint64
+        self._a = rng.randint(1, 2**31, size=num_perm).astype(np.uint64)
+        self._b = rng.randint(0, 2**31, size=num_perm).astype(np.uint64)
+
+    def shingles(self, text: str) -> np.ndarray:
+        """Hashed word shingles of normalized text"""
+        tokens = re.findall(r'[a-z0-9+#]+', text.lower())
+        if len(tokens) < self.shingle_size:
+            tokens = tokens + [''] * (self.shingle_size - len(tokens))
+        hashes = {
+            zlib.crc32(" ".join(tokens[i:i + self.shingle_size]).encode('utf-8'))
+            for i in range(len(tokens) - self.shingle_size + 1)
+        }
+        return np.fromiter(hashes, dtype=np.uint64, count=len(hashes))
+
+    def signature(self, text: str) -> np.ndarray:
+        shingles = self.shingles(text)
+        hashed = (np.outer(shingles, self._a) + self._b) % _PRIME
+        return hashed.min(axis=0)
+
+    def candidate_pairs(
+        self,
+        signatures: np.ndarray,
+        emails: Optional[List[Optional[str]]] = None
+    ) -> Set[Tuple[int, int]]:
+        buckets: Dict[Tuple, List[int]] = defaultdict(list)
+        for doc_idx, sig in enumerate(signatures):
+            for band in range(self.bands):
+                band_key = sig[band * self.rows:(band + 1) * self.rows].tobytes()
+                buckets[(band, band_key)].append(doc_idx)
+        for doc_idx, email in enumerate(emails or []):
+            if email:
+                buckets[('email', email.lower())].append(doc_idx)
+
+        pairs: Set[Tuple[int, int]] = set()
+        for members in buckets.values():
+            if len(members) < 2 or len(members) > self.max_bucket_size:
+                continue
+            for i, first in enumerate(members):
+                for second in members[i + 1:]:
+                    pairs.add((first, second))
+        return pairs
+
+    def cluster(
+        self,
+        texts: List[str],
+        embeddings: np.ndarray,
+        emails: Optional[List[Optional[str]]] = None
+    ) -> np.ndarray:
+        """Return a cluster id per document; near-duplicates share an id"""
+        if not texts:
+            return np.zeros(0, dtype=np.int64)
+        signatures = np.stack([self.signature(text) for text in texts])
+        norms = np.linalg.norm(embeddings, axis=1)
+        norms[norms == 0] = 1.0
+        unit = embeddings / norms[:, None]
+
+        parent = list(range(len(texts)))
+
+        def find(x: int) -> int:
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        for first, second in self.candidate_pairs(signatures, emails):
+            jaccard = float(np.mean(signatures[first] == signatures[second]))
+            cosine = float(np.dot(unit[first], unit[second]))
+            is_duplicate = jaccard >= self.jaccard_threshold or (
+                jaccard >= self.min_jaccard_with_embedding and cosine >= self.embedding_threshold
+            )
+            if (not is_duplicate and self.email_embedding_threshold is not None
+                    and emails and emails[first] and emails[second]):
+                is_duplicate = (
+                    emails[first].lower() == emails[second].lower()
+                    and cosine >= self.email_embedding_threshold
+                )
+            if is_duplicate:
+                root_first, root_second = find(first), find(second)
+                if root_first != root_second:
+                    parent[max(root_first, root_second)] = min(root_first, root_second)
+
+        # Cluster id is the lowest document index in the cluster
+        return np.array([find(doc_idx) for doc_idx in range(len(texts))], dtype=np.int64)
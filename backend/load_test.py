@@ -0,0 +1,97 @@
+"""
+Script to offer increasing open-loop load to /search and report latency percentiles
+Start the backend first, then run: python load_test.py --rates 5,10,20,40,80 --duration 20
+Accepted requests should keep a flat p99 while extra load is shed with 429/503
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import Counter
+from urllib.parse import urlparse
+
+QUERIES = [
+    "Find React developers with fintech experience",
+    "Python backend engineer with AWS and Docker",
+    "QA engineer with Selenium automation",
+    "Data scientist with machine learning and TensorFlow",
+    "Full stack developer with Node.js and MongoDB",
+    "Associate quality assurance engineer",
+]
+
+
+async def post_search(host, port, path, query, timeout):
+    """Send one POST request over a fresh connection, return (status, seconds)"""
+    body = json.dumps({"query": query}).encode("utf-8")
+    request = (
+        f"POST {path} HTTP/1.1\r\n"
+        f"Host: {host}:{port}\r\n"
+        "Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        "Connection: close\r\n\r\n"
+    ).encode("utf-8") + body
+
+    started = time.perf_counter()
+    writer = None
+    try:
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+        writer.write(request)
+        await writer.drain()
+        status_line = await asyncio.wait_for(reader.readline(), timeout)
+        await asyncio.wait_for(reader.read(), timeout)
+        status = int(status_line.split()[1])
+    except (asyncio.TimeoutError, OSError, IndexError, ValueError):
+        status = 0  # connection error or client timeout
+    finally:
+        if writer is not None:
+            writer.close()
+    return status, time.perf_counter() - started
+
+
+def percentile(values, pct):
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def run_rate(host, port, path, rate, duration, timeout):
+    """Fire requests at a fixed Poisson rate regardless of response times"""
+    rng = random.Random(rate)
+    tasks = []
+    end = time.perf_counter() + duration
+    while time.perf_counter() < end:
+        tasks.append(asyncio.create_task(post_search(host, port, path, rng.choice(QUERIES), timeout)))
+        await asyncio.sleep(rng.expovariate(rate))
+    return await asyncio.gather(*tasks)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", default="http://localhost:8000/search")
+    parser.add_argument("--rates", default="5,10,20,40,80", help="comma-separated requests per second")
+    parser.add_argument("--duration", type=float, default=20, help="seconds per rate")
+    parser.add_argument("--timeout", type=float, default=30, help="client-side timeout in seconds")
+    args = parser.parse_args()
+
+    url = urlparse(args.url)
+    host, port, path = url.hostname, url.port or 80, url.path or "/"
+
+    print(f"{'rate/s':>7} {'sent':>6} {'ok':>6} {'429':>5} {'503':>5} {'other':>6} "
+          f"{'p50 ms':>8} {'p99 ms':>8} {'shed p99 ms':>12}")
+    for rate in [float(r) for r in args.rates.split(",")]:
+        results = await run_rate(host, port, path, rate, args.duration, args.timeout)
+        statuses = Counter(status for status, _ in results)
+        ok = [seconds * 1000 for status, seconds in results if status == 200]
+        shed = [seconds * 1000 for status, seconds in results if status in (429, 503)]
+        other = len(results) - statuses[200] - statuses[429] - statuses[503]
+        print(f"{rate:>7.0f} {len(results):>6} {statuses[200]:>6} {statuses[429]:>5} "
+              f"{statuses[503]:>5} {other:>6} {percentile(ok, 50):>8.1f} "
+              f"{percentile(ok, 99):>8.1f} {percentile(shed, 99):>12.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
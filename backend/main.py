@@ -1,11 +1,13 @@
 from fastapi import FastAPI, HTTPException, UploadFile, File
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse
-from pydantic import BaseModel
-from typing import List, Optional
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional, Union
+from functools import partial
 import os
 import shutil
 from pathlib import Path
+from admission import AdmissionController, DeadlineExceeded, Overloaded
 from resume_processor import ResumeProcessor
 from dotenv import load_dotenv
 
@@ -25,19 +27,49 @@ app.add_middleware(
 # Initialize resume processor
 resume_processor = ResumeProcessor()
 
+# Bounded worker pool for search; re-indexing runs on it at lower priority
+admission = AdmissionController(
+    max_workers=int(os.getenv("SEARCH_WORKERS", "4")),
+    max_queue=int(os.getenv("SEARCH_MAX_QUEUE", "16")),
+    default_deadline_ms=float(os.getenv("SEARCH_DEADLINE_MS", "2000")),
+    background_max_wait_s=float(os.getenv("REINDEX_MAX_WAIT_S", "5"))
+)
+# Upper bound on client-supplied deadlines
+SEARCH_MAX_DEADLINE_MS = float(os.getenv("SEARCH_MAX_DEADLINE_MS", "10000"))
+
 # Create temp uploads directory
 TEMP_UPLOADS_DIR = os.path.join(os.path.dirname(__file__), "temp_uploads")
 os.makedirs(TEMP_UPLOADS_DIR, exist_ok=True)
 
-# Track current resume source
-current_source = "local"  # "local" or "uploaded"
+def current_source() -> str:
+    """Source of the live index: "local" or "uploaded" (swapped together with it)"""
+    return resume_processor.source or "local"
+
+# Second-stage re-ranking; off unless enabled, since it needs a second model
+RERANK_ENABLED = os.getenv("RERANK_ENABLED", "false").lower() in ("1", "true", "yes")
+# Re-ranking latency budget per request (milliseconds)
+RERANK_LATENCY_BUDGET_MS = float(os.getenv("RERANK_LATENCY_BUDGET_MS", "300"))
+RERANK_MAX_LATENCY_BUDGET_MS = float(os.getenv("RERANK_MAX_LATENCY_BUDGET_MS", "1000"))
+RERANK_TOP_N = int(os.getenv("RERANK_TOP_N", "20"))
 
 class QueryRequest(BaseModel):
     query: str
+    rerank: bool = False
+    latency_budget_ms: Optional[float] = Field(None, gt=0)
+    include_snippets: bool = True
+    collapse_duplicates: bool = False
+    deadline_ms: Optional[float] = Field(None, gt=0)
 
 class ResumeSourceRequest(BaseModel):
     source: str  # "local" or "uploaded"
 
+class SnippetResponse(BaseModel):
+    text: str
+    page: int
+    section: str
+    score: float
+    highlights: List[List[int]]  # [start, end] character ranges of query terms in text
+
 class CandidateResponse(BaseModel):
     candidate_id: str
     candidate_name: str
@@ -46,29 +78,41 @@ class CandidateResponse(BaseModel):
     explanation: str
     skills: List[str]
     experience_summary: str
+    rerank_score: Optional[float] = None
+    snippets: Optional[List[SnippetResponse]] = None
+    cluster_id: Optional[int] = None
+    duplicate_ids: List[str] = []  # Other resumes of the same candidate
 
 class SearchResponse(BaseModel):
     candidates: List[CandidateResponse]
     message: Optional[str] = None
+    timings: Optional[Dict[str, Union[bool, float]]] = None
 
 @app.on_event("startup")
 async def startup_event():
     """Index all resumes on startup"""
-    global current_source
-    current_source = "local"
+    # Re-ranking is optional: load its model up front only when enabled, so the
+    # first re-ranked search stays within budget
+    if RERANK_ENABLED:
+        resume_processor.reranker.load()
     resumes_dir = os.path.join(os.path.dirname(__file__), "..", "resumes")
     if os.path.exists(resumes_dir):
-        resume_processor.index_resumes(resumes_dir)
+        resume_processor.index_resumes(resumes_dir, source="local")
         print(f"Indexed {len(resume_processor.resumes)} resumes from local folder")
     else:
         print("No resumes directory found. Please add resumes to the /resumes folder.")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    admission.shutdown()
+
 @app.get("/")
 async def root():
     return {
         "message": "Resume Search API",
         "indexed_resumes": len(resume_processor.resumes),
-        "current_source": current_source,
+        "duplicate_groups": len(resume_processor.duplicate_groups),
+        "current_source": current_source(),
         "status": "ready"
     }
 
@@ -84,11 +128,47 @@ async def search_candidates(query: QueryRequest):
     if not query.query.strip():
         raise HTTPException(status_code=400, detail="Query cannot be empty")
     
-    results = resume_processor.search(query.query, top_k=5)
+    timings = {}
+    # Client limits are validated > 0 and capped by the server maximums
+    deadline_ms = admission.default_deadline_ms
+    if query.deadline_ms is not None:
+        deadline_ms = min(query.deadline_ms, SEARCH_MAX_DEADLINE_MS)
+    latency_budget_ms = RERANK_LATENCY_BUDGET_MS
+    if query.latency_budget_ms is not None:
+        latency_budget_ms = min(query.latency_budget_ms, RERANK_MAX_LATENCY_BUDGET_MS)
+    # Absolute deadline, so time spent queueing for a worker counts against it
+    deadline = admission.deadline(deadline_ms)
+    search = partial(
+        resume_processor.search,
+        query.query,
+        top_k=5,
+        rerank=query.rerank,
+        rerank_top_n=RERANK_TOP_N,
+        latency_budget_ms=latency_budget_ms,
+        timings=timings,
+        include_snippets=query.include_snippets,
+        collapse_duplicates=query.collapse_duplicates,
+        deadline=deadline
+    )
+    try:
+        results = await admission.run(search, deadline=deadline)
+    except Overloaded as e:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many concurrent searches. Please retry shortly.",
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    except DeadlineExceeded as e:
+        raise HTTPException(
+            status_code=503,
+            detail="Search could not be completed in time. Please retry shortly.",
+            headers={"Retry-After": str(e.retry_after)}
+        )
     
     if not results:
         return SearchResponse(
             candidates=[],
+            timings=timings,
             message="I'm not sure - I couldn't find any candidates that are a good match for your requirements. Try adjusting your query or using different keywords. Our database includes skills like React, Python, Java, Node.js, Machine Learning, and more."
         )
     
@@ -101,44 +181,52 @@ async def search_candidates(query: QueryRequest):
             score=result['score'],
             explanation=result['explanation'],
             skills=result['skills'],
-            experience_summary=result['experience_summary']
+            experience_summary=result['experience_summary'],
+            rerank_score=result.get('rerank_score'),
+            snippets=result.get('snippets'),
+            cluster_id=result.get('cluster_id'),
+            duplicate_ids=result.get('duplicate_ids', [])
         )
         candidates.append(candidate)
     
-    return SearchResponse(candidates=candidates)
+    return SearchResponse(candidates=candidates, timings=timings)
 
 @app.get("/health")
 async def health_check():
     return {
         "status": "healthy", 
         "indexed_resumes": len(resume_processor.resumes),
-        "current_source": current_source
+        "current_source": current_source(),
+        "search_queue_depth": admission.queue_depth,
+        "busy_workers": admission.busy_workers
     }
 
 @app.post("/upload-resumes")
 async def upload_resumes(files: List[UploadFile] = File(...)):
     """Upload multiple resume PDFs temporarily"""
-    global current_source
-    
-    # Clear existing temp uploads
-    if os.path.exists(TEMP_UPLOADS_DIR):
-        shutil.rmtree(TEMP_UPLOADS_DIR)
-    os.makedirs(TEMP_UPLOADS_DIR, exist_ok=True)
-    
-    uploaded_files = []
-    for file in files:
-        if not file.filename.endswith('.pdf'):
-            continue
+    # Only one re-index at a time: it also keeps the folder from being
+    # cleared while a previous re-index is still reading from it
+    async with admission.background_lock():
+        # Clear existing temp uploads
+        if os.path.exists(TEMP_UPLOADS_DIR):
+            shutil.rmtree(TEMP_UPLOADS_DIR)
+        os.makedirs(TEMP_UPLOADS_DIR, exist_ok=True)
         
-        file_path = os.path.join(TEMP_UPLOADS_DIR, file.filename)
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-        uploaded_files.append(file.filename)
+        uploaded_files = []
+        for file in files:
+            if not file.filename.endswith('.pdf'):
+                continue
+            
+            file_path = os.path.join(TEMP_UPLOADS_DIR, file.filename)
+            with open(file_path, "wb") as buffer:
+                shutil.copyfileobj(file.file, buffer)
+            uploaded_files.append(file.filename)
+        
+        # Re-index with uploaded resumes
+        if uploaded_files:
+            await admission.run_background(resume_processor.index_resumes, TEMP_UPLOADS_DIR, "uploaded")
     
-    # Re-index with uploaded resumes
     if uploaded_files:
-        resume_processor.index_resumes(TEMP_UPLOADS_DIR)
-        current_source = "uploaded"
         return {
             "message": f"Successfully uploaded and indexed {len(uploaded_files)} resumes",
             "files": uploaded_files,
@@ -150,8 +238,6 @@ async def upload_resumes(files: List[UploadFile] = File(...)):
 @app.post("/set-resume-source")
 async def set_resume_source(request: ResumeSourceRequest):
     """Switch between local and uploaded resume sources"""
-    global current_source
-    
     if request.source not in ["local", "uploaded"]:
         raise HTTPException(status_code=400, detail="Invalid source. Must be 'local' or 'uploaded'")
     
@@ -159,22 +245,22 @@ async def set_resume_source(request: ResumeSourceRequest):
         resumes_dir = os.path.join(os.path.dirname(__file__), "..", "resumes")
         if not os.path.exists(resumes_dir):
             raise HTTPException(status_code=404, detail="Local resumes folder not found")
-        resume_processor.index_resumes(resumes_dir)
-        current_source = "local"
+        async with admission.background_lock():
+            await admission.run_background(resume_processor.index_resumes, resumes_dir, "local")
         return {
             "message": f"Switched to local resumes",
             "indexed_count": len(resume_processor.resumes),
-            "current_source": current_source
+            "current_source": current_source()
         }
     else:  # uploaded
-        if not os.path.exists(TEMP_UPLOADS_DIR) or not os.listdir(TEMP_UPLOADS_DIR):
-            raise HTTPException(status_code=404, detail="No uploaded resumes found. Please upload resumes first.")
-        resume_processor.index_resumes(TEMP_UPLOADS_DIR)
-        current_source = "uploaded"
+        async with admission.background_lock():
+            if not os.path.exists(TEMP_UPLOADS_DIR) or not os.listdir(TEMP_UPLOADS_DIR):
+                raise HTTPException(status_code=404, detail="No uploaded resumes found. Please upload resumes first.")
+            await admission.run_background(resume_processor.index_resumes, TEMP_UPLOADS_DIR, "uploaded")
         return {
             "message": f"Switched to uploaded resumes",
             "indexed_count": len(resume_processor.resumes),
-            "current_source": current_source
+            "current_source": current_source()
         }
 
 @app.get("/uploaded-resumes")
@@ -189,29 +275,39 @@ async def get_uploaded_resumes():
 @app.delete("/clear-uploads")
 async def clear_uploads():
     """Clear all uploaded resumes and switch back to local"""
-    global current_source
-    
-    if os.path.exists(TEMP_UPLOADS_DIR):
-        shutil.rmtree(TEMP_UPLOADS_DIR)
-        os.makedirs(TEMP_UPLOADS_DIR, exist_ok=True)
-    
-    # Switch back to local resumes
-    resumes_dir = os.path.join(os.path.dirname(__file__), "..", "resumes")
-    if os.path.exists(resumes_dir):
-        resume_processor.index_resumes(resumes_dir)
-        current_source = "local"
+    async with admission.background_lock():
+        if os.path.exists(TEMP_UPLOADS_DIR):
+            shutil.rmtree(TEMP_UPLOADS_DIR)
+            os.makedirs(TEMP_UPLOADS_DIR, exist_ok=True)
+        
+        # Switch back to local resumes
+        resumes_dir = os.path.join(os.path.dirname(__file__), "..", "resumes")
+        if os.path.exists(resumes_dir):
+            await admission.run_background(resume_processor.index_resumes, resumes_dir, "local")
     
     return {
         "message": "Cleared all uploaded resumes and switched to local",
-        "current_source": current_source,
+        "current_source": current_source(),
         "indexed_count": len(resume_processor.resumes)
     }
 
+@app.get("/resume/{candidate_id}/snippets", response_model=List[SnippetResponse])
+async def get_resume_snippets(candidate_id: str, query: str, limit: int = 3):
+    """Return the best matching passages of a resume with highlighted query terms"""
+    if not query.strip():
+        raise HTTPException(status_code=400, detail="Query cannot be empty")
+    
+    snippets = resume_processor.get_snippets(candidate_id, query, limit=min(max(limit, 1), 10))
+    if snippets is None:
+        raise HTTPException(status_code=404, detail="Resume not found")
+    
+    return snippets
+
 @app.get("/resume/{filename}")
 async def get_resume(filename: str):
     """Serve resume PDF files from current source"""
     # Check current source directory first
-    if current_source == "uploaded":
+    if current_source() == "uploaded":
         file_path = os.path.join(TEMP_UPLOADS_DIR, filename)
     else:
         resumes_dir = os.path.join(os.path.dirname(__file__), "..", "resumes")
@@ -0,0 +1,142 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from sentence_transformers import CrossEncoder
+
+
+class CrossEncoderReranker:
+    """Second-stage re-ranker that scores (query, resume chunk) pairs with a cross-encoder"""
+
+    def __init__(
+        self,
+        model_name: str = 'cross-encoder/ms-marco-MiniLM-L-6-v2',
+        batch_size: int = 16,
+        chunk_words: int = 200,
+        max_chunks_per_resume: int = 4,
+        cache_size: int = 4096
+    ):
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.chunk_words = chunk_words
+        self.max_chunks_per_resume = max_chunks_per_resume
+        self.cache_size = cache_size
+        self._model: Optional[CrossEncoder] = None
+        self._cache: "OrderedDict[Tuple[str, str], float]" = OrderedDict()
+        # Searches run on several worker threads; the cache lock is never
+        # held while the model loads
+        self._lock = threading.Lock()
+        self._model_lock = threading.Lock()
+        # Moving average of scoring time per pair (ms), shared by all requests
+        # and used to size batches to the remaining latency budget
+        self._pair_ms: Optional[float] = None
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._model is not None
+
+    def load(self) -> bool:
+        """Load the cross-encoder; call at startup so no request pays for it
+
+        A warm-up batch seeds the per-pair latency estimate, so the very first
+        request can already be held to its budget. Returns False if the model
+        could not be loaded (e.g. offline); re-ranking then stays disabled.
+        """
+        with self._model_lock:
+            if self._model is None:
+                try:
+                    model = CrossEncoder(self.model_name)
+                    warmup = [("warm up", "cross-encoder warm up passage")] * self.batch_size
+                    started = time.perf_counter()
+                    model.predict(warmup, batch_size=self.batch_size)
+                except Exception as e:
+                    print(f"Error loading re-ranker {self.model_name}, re-ranking disabled: {e}")
+                    return False
+                self._record_batch(len(warmup), (time.perf_counter() - started) * 1000)
+                self._model = model
+            return True
+
+    def chunk_text(self, text: str) -> List[str]:
+        """Split resume text into word windows that fit the cross-encoder input"""
+        words = text.split()
+        chunks = []
+        for start in range(0, len(words), self.chunk_words):
+            chunks.append(" ".join(words[start:start + self.chunk_words]))
+            if len(chunks) >= self.max_chunks_per_resume:
+                break
+        return chunks
+
+    def rerank(
+        self,
+        query: str,
+        texts: List[str],
+        latency_budget_ms: Optional[float] = None
+    ) -> Optional[List[float]]:
+        """Score each text against the query, best chunk wins.
+
+        Returns one score per text, or None if the model is not loaded or the
+        latency budget ran out before every pair could be scored. Batches are sized from the running
+        per-pair latency estimate, so a tight budget stops before a batch
+        starts rather than after it overshoots.
+        """
+        # Never loaded here: a cold load would blow any latency budget
+        model = self._model
+        if model is None:
+            return None
+        start = time.perf_counter()
+        chunk_owner: List[int] = []
+        pairs: List[Tuple[str, str]] = []
+        for text_idx, text in enumerate(texts):
+            for chunk in self.chunk_text(text):
+                chunk_owner.append(text_idx)
+                pairs.append((query, chunk))
+
+        pair_scores: List[Optional[float]] = [self._cache_get(pair) for pair in pairs]
+        pending = [i for i, score in enumerate(pair_scores) if score is None]
+
+        while pending:
+            batch_size = self.batch_size
+            if latency_budget_ms is not None:
+                remaining_ms = latency_budget_ms - (time.perf_counter() - start) * 1000
+                # Only score as many pairs as are expected to fit in the budget;
+                # the ones scored still go into the cache for the next request
+                if self._pair_ms:
+                    batch_size = min(batch_size, int(remaining_ms / self._pair_ms))
+                if remaining_ms <= 0 or batch_size < 1:
+                    return None
+
+            batch_started = time.perf_counter()
+            batch, pending = pending[:batch_size], pending[batch_size:]
+            scores = model.predict([pairs[i] for i in batch], batch_size=self.batch_size)
+            for i, score in zip(batch, scores):
+                pair_scores[i] = float(score)
+                self._cache_put(pairs[i], float(score))
+            self._record_batch(len(batch), (time.perf_counter() - batch_started) * 1000)
+
+        best: List[float] = [float('-inf')] * len(texts)
+        for text_idx, score in zip(chunk_owner, pair_scores):
+            best[text_idx] = max(best[text_idx], score)
+        return best
+
+    def _record_batch(self, num_pairs: int, elapsed_ms: float):
+        pair_ms = elapsed_ms / num_pairs
+        with self._lock:
+            if self._pair_ms is None:
+                self._pair_ms = pair_ms
+            else:
+                self._pair_ms = 0.8 * self._pair_ms + 0.2 * pair_ms
+
+    def _cache_get(self, pair: Tuple[str, str]) -> Optional[float]:
+        with self._lock:
+            score = self._cache.get(pair)
+            if score is not None:
+                self._cache.move_to_end(pair)
+            return score
+
+    def _cache_put(self, pair: Tuple[str, str], score: float):
+        with self._lock:
+            self._cache[pair] = score
+            self._cache.move_to_end(pair)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
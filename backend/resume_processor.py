@@ -1,30 +1,66 @@
 import os
 import re
+import threading
+import time
 import pdfplumber
 import numpy as np
 import faiss
 from sentence_transformers import SentenceTransformer
 from typing import List, Dict, Optional
 import json
+from dedup import DuplicateDetector
+from reranker import CrossEncoderReranker
+from resume_store import ResumeStore
+from snippets import query_terms, split_passages, top_snippets
+
+# Common tech keywords used for skills extraction
+SKILL_KEYWORDS = [
+    'python', 'java', 'javascript', 'react', 'node.js', 'nodejs', 'angular', 
+    'vue', 'typescript', 'c++', 'c#', 'ruby', 'php', 'swift', 'kotlin',
+    'sql', 'mongodb', 'postgresql', 'mysql', 'redis', 'aws', 'azure', 'gcp',
+    'docker', 'kubernetes', 'jenkins', 'git', 'agile', 'scrum',
+    'machine learning', 'deep learning', 'ai', 'data science', 'tensorflow',
+    'pytorch', 'rest api', 'graphql', 'microservices', 'devops',
+    'fintech', 'blockchain', 'cybersecurity', 'cloud computing'
+]
 
 class ResumeProcessor:
     def __init__(self):
         self.model = SentenceTransformer('all-MiniLM-L6-v2')
-        self.resumes: List[Dict] = []
+        # Where indexed resume text is spilled to disk (system temp dir by default).
+        # Keep it on a disk-backed filesystem: on tmpfs the text stays in RAM.
+        # Read here, not at import, so values from backend/.env are picked up
+        self.blob_dir = os.getenv("RESUME_BLOB_DIR") or None
+        self.resumes: ResumeStore = ResumeStore(SKILL_KEYWORDS, blob_dir=self.blob_dir)
         self.index: Optional[faiss.IndexFlatL2] = None
         self.embeddings: Optional[np.ndarray] = None
+        # Where the current index came from ("local" or "uploaded"), swapped with it
+        self.source: Optional[str] = None
+        # Near-duplicate clusters: cluster id per resume, and members of clusters with >1 resume
+        self.cluster_ids: Optional[np.ndarray] = None
+        self.duplicate_groups: Dict[int, List[int]] = {}
+        email_min_cosine = os.getenv("DEDUP_EMAIL_MIN_COSINE")
+        self.duplicate_detector = DuplicateDetector(
+            email_embedding_threshold=float(email_min_cosine) if email_min_cosine else None
+        )
+        # Guards swapping in a freshly built index while searches run on worker threads
+        self._state_lock = threading.Lock()
+        self.reranker = CrossEncoderReranker(
+            model_name=os.getenv("RERANK_MODEL", 'cross-encoder/ms-marco-MiniLM-L-6-v2')
+        )
         
-    def extract_text_from_pdf(self, pdf_path: str) -> str:
-        """Extract text content from PDF"""
+    def extract_pages_from_pdf(self, pdf_path: str) -> List[str]:
+        """Extract text content from PDF, one string per page"""
         try:
             with pdfplumber.open(pdf_path) as pdf:
-                text = ""
-                for page in pdf.pages:
-                    text += page.extract_text() or ""
-                return text
+                return [page.extract_text() or "" for page in pdf.pages]
         except Exception as e:
             print(f"Error extracting text from {pdf_path}: {e}")
-            return ""
+            return []
+    
+    def extract_text_from_pdf(self, pdf_path: str) -> str:
+        """Extract text content from PDF"""
+        return "\n".join(self.extract_pages_from_pdf(pdf_path))
     
     def extract_candidate_info(self, text: str, filename: str) -> Dict:
         """Extract structured information from resume text"""
@@ -44,17 +80,7 @@ class ResumeProcessor:
         
         # Extract skills (common tech keywords)
         text_lower = text.lower()
-        skill_keywords = [
-            'python', 'java', 'javascript', 'react', 'node.js', 'nodejs', 'angular', 
-            'vue', 'typescript', 'c++', 'c#', 'ruby', 'php', 'swift', 'kotlin',
-            'sql', 'mongodb', 'postgresql', 'mysql', 'redis', 'aws', 'azure', 'gcp',
-            'docker', 'kubernetes', 'jenkins', 'git', 'agile', 'scrum',
-            'machine learning', 'deep learning', 'ai', 'data science', 'tensorflow',
-            'pytorch', 'rest api', 'graphql', 'microservices', 'devops',
-            'fintech', 'blockchain', 'cybersecurity', 'cloud computing'
-        ]
-        
-        found_skills = [skill for skill in skill_keywords if skill in text_lower]
+        found_skills = [skill for skill in SKILL_KEYWORDS if skill in text_lower]
         
         # Extract experience summary (look for years of experience)
         experience_pattern = r'(\d+)\+?\s*years?\s*(of)?\s*experience'
@@ -83,74 +109,189 @@ class ResumeProcessor:
             'full_text': text
         }
     
-    def index_resumes(self, resumes_dir: str):
-        """Index all PDF resumes in the directory"""
-        self.resumes = []
+    def index_resumes(self, resumes_dir: str, source: Optional[str] = None):
+        """Index all PDF resumes in the directory
+
+        The new index is built on the side and swapped in at the end, together
+        with its source label, so searches running concurrently keep using the
+        previous one. Callers must not run two re-indexes at once.
+        """
+        resumes = ResumeStore(SKILL_KEYWORDS, blob_dir=self.blob_dir)
         texts_to_embed = []
+        emails = []
         
         if not os.path.exists(resumes_dir):
             print(f"Directory {resumes_dir} does not exist")
+            self._swap_index(source, resumes)
             return
         
         pdf_files = [f for f in os.listdir(resumes_dir) if f.endswith('.pdf')]
         
         if not pdf_files:
             print(f"No PDF files found in {resumes_dir}")
+            self._swap_index(source, resumes)
             return
         
         for filename in pdf_files:
             filepath = os.path.join(resumes_dir, filename)
-            text = self.extract_text_from_pdf(filepath)
+            pages = self.extract_pages_from_pdf(filepath)
+            text = "\n".join(pages)
             
-            if not text:
+            if not text.strip():
                 continue
             
             info = self.extract_candidate_info(text, filename)
             
-            resume_data = {
-                'id': filename.replace('.pdf', ''),
-                'path': filepath,
-                'filename': filename,
-                **info
-            }
-            
-            self.resumes.append(resume_data)
+            # Page/section passage offsets let snippets skip re-reading the PDF
+            resumes.append(filepath, info, split_passages(pages))
             texts_to_embed.append(text)
+            emails.append(info['email'])
         
         if not texts_to_embed:
             print("No resumes were successfully processed")
+            self._swap_index(source, resumes)
             return
         
         # Create embeddings
         print(f"Creating embeddings for {len(texts_to_embed)} resumes...")
-        self.embeddings = self.model.encode(texts_to_embed, show_progress_bar=True)
+        embeddings = self.model.encode(texts_to_embed, show_progress_bar=True)
         
         # Create FAISS index
-        dimension = self.embeddings.shape[1]
-        self.index = faiss.IndexFlatL2(dimension)
-        self.index.add(self.embeddings.astype('float32'))
+        dimension = embeddings.shape[1]
+        index = faiss.IndexFlatL2(dimension)
+        index.add(embeddings.astype('float32'))
         
-        print(f"Successfully indexed {len(self.resumes)} resumes")
+        # Group near-duplicate resumes (same candidate, different variants)
+        cluster_ids = self.duplicate_detector.cluster(texts_to_embed, embeddings, emails)
+        groups: Dict[int, List[int]] = {}
+        for resume_idx, cluster_id in enumerate(cluster_ids):
+            groups.setdefault(int(cluster_id), []).append(resume_idx)
+        duplicate_groups = {cid: members for cid, members in groups.items() if len(members) > 1}
+        if duplicate_groups:
+            print(f"Found {len(duplicate_groups)} groups of near-duplicate resumes")
+        
+        # Map the text blob before any search thread can read it
+        resumes.seal()
+        self._swap_index(source, resumes, index, embeddings, cluster_ids, duplicate_groups)
+        print(f"Successfully indexed {len(resumes)} resumes")
+    
+    def _swap_index(
+        self,
+        source: Optional[str],
+        resumes: ResumeStore,
+        index: Optional[faiss.IndexFlatL2] = None,
+        embeddings: Optional[np.ndarray] = None,
+        cluster_ids: Optional[np.ndarray] = None,
+        duplicate_groups: Optional[Dict[int, List[int]]] = None
+    ):
+        # The previous store is not closed here: searches that snapshotted it
+        # may still be reading its mmap. It is released by reference counting
+        # once they finish.
+        with self._state_lock:
+            self.source = source
+            self.resumes = resumes
+            self.index = index
+            self.embeddings = embeddings
+            self.cluster_ids = cluster_ids
+            self.duplicate_groups = duplicate_groups or {}
     
-    def search(self, query: str, top_k: int = 5) -> List[Dict]:
-        """Search for candidates matching the query"""
-        if not self.resumes or self.index is None:
+    def search(
+        self,
+        query: str,
+        top_k: int = 5,
+        rerank: bool = False,
+        rerank_top_n: int = 20,
+        latency_budget_ms: Optional[float] = None,
+        timings: Optional[Dict] = None,
+        include_snippets: bool = False,
+        snippet_limit: int = 3,
+        collapse_duplicates: bool = False,
+        deadline: Optional[float] = None
+    ) -> List[Dict]:
+        """Search for candidates matching the query
+
+        With rerank=True the top rerank_top_n FAISS hits are re-scored by the
+        cross-encoder; if the latency budget runs out, first-stage order is kept.
+        With collapse_duplicates=True only the best-ranked resume of each
+        near-duplicate cluster is returned.
+        deadline is an absolute time.monotonic() value; re-ranking never runs past it,
+        and TimeoutError is raised between stages once it has passed, so an
+        abandoned search frees its worker early.
+        Per-stage timings (ms) are written into the timings dict when given.
+        """
+        if timings is None:
+            timings = {}
+        with self._state_lock:
+            resumes, index = self.resumes, self.index
+            cluster_ids, duplicate_groups = self.cluster_ids, self.duplicate_groups
+        if not resumes or index is None:
             return []
         
+        terms = query_terms(query) if include_snippets else []
+        
+        search_started = time.perf_counter()
+        
         # Encode query
         query_embedding = self.model.encode([query])
+        timings['encode_ms'] = self._elapsed_ms(search_started)
+        self._check_deadline(deadline)
         
         # Search in FAISS index
-        k = min(top_k, len(self.resumes))
-        distances, indices = self.index.search(query_embedding.astype('float32'), k)
+        faiss_started = time.perf_counter()
+        candidate_k = top_k * 3 if collapse_duplicates else top_k
+        if rerank:
+            candidate_k = max(candidate_k, rerank_top_n)
+        k = min(candidate_k, len(resumes))
+        distances, indices = index.search(query_embedding.astype('float32'), k)
+        timings['faiss_ms'] = self._elapsed_ms(faiss_started)
+        self._check_deadline(deadline)
         
-        results = []
-        for idx, (distance, resume_idx) in enumerate(zip(distances[0], indices[0])):
-            resume = self.resumes[resume_idx]
-            
+        hits = []
+        for distance, resume_idx in zip(distances[0], indices[0]):
             # Convert distance to similarity score (lower distance = higher similarity)
             # Normalize to 0-1 range
-            score = float(1 / (1 + distance))
+            score = round(float(1 / (1 + distance)), 3)
+            hits.append((int(resume_idx), score))
+        
+        # Filter out poor matches with more strict threshold
+        # Only return candidates with score > 0.5 (50% match)
+        hits = [hit for hit in hits if hit[1] > 0.5]
+        
+        rerank_scores: Dict[int, float] = {}
+        timings['reranked'] = False
+        if rerank and len(hits) > 1 and self.reranker.is_loaded:
+            rerank_started = time.perf_counter()
+            remaining_ms = None
+            if latency_budget_ms is not None:
+                remaining_ms = latency_budget_ms - self._elapsed_ms(search_started)
+            if deadline is not None:
+                until_deadline_ms = (deadline - time.monotonic()) * 1000
+                remaining_ms = until_deadline_ms if remaining_ms is None else min(remaining_ms, until_deadline_ms)
+            texts = [resumes[resume_idx]['full_text'] for resume_idx, _ in hits]
+            scores = None
+            if remaining_ms is None or remaining_ms > 0:
+                scores = self.reranker.rerank(query, texts, latency_budget_ms=remaining_ms)
+            # scores is None when the budget ran out: keep first-stage order
+            if scores is not None:
+                rerank_scores = {resume_idx: score for (resume_idx, _), score in zip(hits, scores)}
+                hits.sort(key=lambda hit: rerank_scores[hit[0]], reverse=True)
+                timings['reranked'] = True
+            timings['rerank_ms'] = self._elapsed_ms(rerank_started)
+        
+        if collapse_duplicates and cluster_ids is not None:
+            seen_clusters = set()
+            collapsed = []
+            for hit in hits:
+                cluster_id = int(cluster_ids[hit[0]])
+                if cluster_id not in seen_clusters:
+                    seen_clusters.add(cluster_id)
+                    collapsed.append(hit)
+            hits = collapsed
+        
+        results = []
+        for resume_idx, score in hits[:top_k]:
+            self._check_deadline(deadline)
+            resume = resumes[resume_idx]
             
             # Generate explanation
             explanation = self._generate_explanation(query, resume)
@@ -160,19 +301,46 @@ class ResumeProcessor:
                 'name': resume['name'],
                 'path': resume['path'],
                 'filename': resume['filename'],
-                'score': round(score, 3),
+                'score': score,
                 'skills': resume['skills'],
                 'experience_summary': resume['experience_summary'],
                 'explanation': explanation
             }
+            if resume_idx in rerank_scores:
+                result['rerank_score'] = round(rerank_scores[resume_idx], 3)
+            if cluster_ids is not None:
+                cluster_id = int(cluster_ids[resume_idx])
+                result['cluster_id'] = cluster_id
+                result['duplicate_ids'] = [
+                    resumes[other]['id']
+                    for other in duplicate_groups.get(cluster_id, [])
+                    if other != resume_idx
+                ]
+            if include_snippets:
+                self._check_deadline(deadline)
+                result['snippets'] = top_snippets(resumes.get_passages(resume_idx), terms, snippet_limit)
             results.append(result)
         
-        # Filter out poor matches with more strict threshold
-        # Only return candidates with score > 0.5 (50% match)
-        results = [r for r in results if r['score'] > 0.5]
-        
+        timings['total_ms'] = self._elapsed_ms(search_started)
         return results
     
+    def get_snippets(self, candidate_id: str, query: str, limit: int = 3) -> Optional[List[Dict]]:
+        """Best matching passages of one resume, or None if it isn't indexed"""
+        resumes = self.resumes
+        resume_idx = resumes.index_of(candidate_id)
+        if resume_idx is None:
+            return None
+        return top_snippets(resumes.get_passages(resume_idx), query_terms(query), limit)
+    
+    @staticmethod
+    def _check_deadline(deadline: Optional[float]):
+        if deadline is not None and time.monotonic() >= deadline:
+            raise TimeoutError("Search deadline exceeded")
+    
+    @staticmethod
+    def _elapsed_ms(started: float) -> float:
+        return round((time.perf_counter() - started) * 1000, 2)
+    
     def _generate_explanation(self, query: str, resume: Dict) -> str:
         """Generate explanation for why this candidate matches"""
         query_lower = query.lower()
@@ -0,0 +1,238 @@
+import mmap
+import os
+import tempfile
+import threading
+from array import array
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+class ResumeRecord(Mapping):
+    """Read-only dict-like view of one resume in a ResumeStore.
+
+    Fields are read from the store's columns on access; 'full_text' is
+    decoded from the memory-mapped text blob only when asked for.
+    """
+
+    FIELDS = ('id', 'path', 'filename', 'name', 'email', 'phone',
+              'skills', 'experience_summary', 'full_text')
+
+    __slots__ = ('_store', '_idx')
+
+    def __init__(self, store: "ResumeStore", idx: int):
+        self._store = store
+        self._idx = idx
+
+    def __getitem__(self, key: str):
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        return self._store.get_field(self._idx, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.FIELDS)
+
+    def __len__(self) -> int:
+        return len(self.FIELDS)
+
+
+class ResumeStore:
+    """Compact columnar storage for indexed resumes.
+
+    Short fields live in per-column lists and arrays, skills are packed into
+    a fixed-width bitset per row, and full resume text is appended to a
+    temporary blob file that is memory-mapped and decoded on demand.
+    Passage offsets (page and section aligned) point into the same blob so
+    snippets can be served without touching the original PDF.
+    """
+
+    def __init__(self, skill_vocabulary: List[str], blob_dir: Optional[str] = None):
+        self.skill_vocabulary = list(skill_vocabulary)
+        self._skill_bits = {skill: i for i, skill in enumerate(self.skill_vocabulary)}
+        self._skill_width = (len(self.skill_vocabulary) + 7) // 8
+
+        # Directories are shared by every resume indexed from them
+        self._dirs: List[str] = []
+        self._dir_lookup: Dict[str, int] = {}
+        self._dir_idx = array('I')
+        self._filenames: List[str] = []
+        self._id_lookup: Dict[str, int] = {}
+        self._names: List[str] = []
+        self._emails: List[Optional[str]] = []
+        self._phones: List[Optional[str]] = []
+        self._experience: List[str] = []
+        self._skills = bytearray()
+        self._text_offsets = array('q')
+        self._text_lengths = array('q')
+
+        # Passages of row i are entries _passage_ptr[i]:_passage_ptr[i + 1]
+        self._passage_ptr = array('q', [0])
+        self._passage_starts = array('q')
+        self._passage_ends = array('q')
+        self._passage_pages = array('I')
+        self._passage_sections = array('I')
+        self._sections: List[str] = []
+        self._section_lookup: Dict[str, int] = {}
+
+        # TemporaryFile is removed when closed or garbage collected
+        self._blob = tempfile.TemporaryFile(dir=blob_dir)
+        self._blob_size = 0
+        self._mmap: Optional[mmap.mmap] = None
+        self._map_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._filenames)
+
+    def __getitem__(self, idx: int) -> ResumeRecord:
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError("resume index out of range")
+        return ResumeRecord(self, idx)
+
+    def __iter__(self) -> Iterator[ResumeRecord]:
+        for idx in range(len(self)):
+            yield ResumeRecord(self, idx)
+
+    def append(
+        self,
+        filepath: str,
+        info: Dict,
+        passages: Optional[List[Tuple[int, int, int, str]]] = None
+    ) -> int:
+        """Add a resume built by ResumeProcessor.extract_candidate_info, return its row
+
+        passages are (start, end, page, section) character offsets into full_text.
+        """
+        directory, filename = os.path.split(filepath)
+        if directory not in self._dir_lookup:
+            self._dir_lookup[directory] = len(self._dirs)
+            self._dirs.append(directory)
+        self._dir_idx.append(self._dir_lookup[directory])
+        self._id_lookup.setdefault(filename.replace('.pdf', ''), len(self._filenames))
+        self._filenames.append(filename)
+        self._names.append(info['name'])
+        self._emails.append(info.get('email'))
+        self._phones.append(info.get('phone'))
+        self._experience.append(info['experience_summary'])
+        self._skills.extend(self._pack_skills(info['skills']))
+
+        text = info['full_text']
+        encoded = text.encode('utf-8')
+        self._blob.seek(self._blob_size)
+        self._blob.write(encoded)
+        self._text_offsets.append(self._blob_size)
+        self._text_lengths.append(len(encoded))
+
+        # Convert character offsets to absolute blob byte offsets
+        char_pos = 0
+        byte_pos = self._blob_size
+        for start, end, page, section in passages or []:
+            byte_pos += len(text[char_pos:start].encode('utf-8'))
+            byte_start = byte_pos
+            byte_pos += len(text[start:end].encode('utf-8'))
+            char_pos = end
+            if section not in self._section_lookup:
+                self._section_lookup[section] = len(self._sections)
+                self._sections.append(section)
+            self._passage_starts.append(byte_start)
+            self._passage_ends.append(byte_pos)
+            self._passage_pages.append(page)
+            self._passage_sections.append(self._section_lookup[section])
+        self._passage_ptr.append(len(self._passage_starts))
+
+        self._blob_size += len(encoded)
+        return len(self._filenames) - 1
+
+    def index_of(self, candidate_id: str) -> Optional[int]:
+        return self._id_lookup.get(candidate_id)
+
+    def get_field(self, idx: int, key: str):
+        filename = self._filenames[idx]
+        if key == 'id':
+            return filename.replace('.pdf', '')
+        if key == 'filename':
+            return filename
+        if key == 'path':
+            return os.path.join(self._dirs[self._dir_idx[idx]], filename)
+        if key == 'name':
+            return self._names[idx]
+        if key == 'email':
+            return self._emails[idx]
+        if key == 'phone':
+            return self._phones[idx]
+        if key == 'skills':
+            return self._unpack_skills(idx)
+        if key == 'experience_summary':
+            return self._experience[idx]
+        if key == 'full_text':
+            return self.get_text(idx)
+        raise KeyError(key)
+
+    def get_text(self, idx: int) -> str:
+        """Read one resume's full text from the blob"""
+        length = self._text_lengths[idx]
+        offset = self._text_offsets[idx]
+        return self._read(offset, offset + length)
+
+    def get_passages(self, idx: int) -> List[Tuple[str, int, str]]:
+        """Read one resume's passages as (text, page, section) from the blob"""
+        passages = []
+        for p in range(self._passage_ptr[idx], self._passage_ptr[idx + 1]):
+            text = self._read(self._passage_starts[p], self._passage_ends[p])
+            section = self._sections[self._passage_sections[p]]
+            passages.append((text, self._passage_pages[p], section))
+        return passages
+
+    def seal(self):
+        """Map the finished blob once, before the store is shared with searches"""
+        self._map(self._blob_size)
+
+    def close(self):
+        """Release the mapping and the blob file
+
+        Only for stores no other thread can still read. A store replaced by a
+        re-index is not closed: searches that started before the swap keep
+        reading from it. It is freed (mapping unmapped, temp file deleted)
+        when the last of them drops its reference.
+        """
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        self._blob.close()
+
+    def _read(self, start: int, end: int) -> str:
+        if start >= end:
+            return ""
+        # Work on a local reference: another thread may swap in a larger map
+        mapped = self._mmap
+        if mapped is None or end > len(mapped):
+            mapped = self._map(end)
+        return mapped[start:end].decode('utf-8')
+
+    def _map(self, min_size: int) -> Optional[mmap.mmap]:
+        # The blob is append-only, so a larger mapping is needed once it grows.
+        # Old maps are left for garbage collection rather than closed, since a
+        # concurrent reader may still be slicing one.
+        with self._map_lock:
+            if self._mmap is not None and len(self._mmap) >= min_size:
+                return self._mmap
+            if self._blob_size == 0:
+                return None
+            self._blob.flush()
+            self._mmap = mmap.mmap(self._blob.fileno(), self._blob_size, access=mmap.ACCESS_READ)
+            return self._mmap
+
+    def _pack_skills(self, skills: List[str]) -> bytes:
+        packed = bytearray(self._skill_width)
+        for skill in skills:
+            bit = self._skill_bits[skill]
+            packed[bit // 8] |= 1 << (bit % 8)
+        return bytes(packed)
+
+    def _unpack_skills(self, idx: int) -> List[str]:
+        start = idx * self._skill_width
+        packed = self._skills[start:start + self._skill_width]
+        return [
+            skill for bit, skill in enumerate(self.skill_vocabulary)
+            if packed[bit // 8] & (1 << (bit % 8))
+        ]
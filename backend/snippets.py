@@ -0,0 +1,126 @@
+import re
+from typing import Dict, List, Tuple
+
+# Resume headings that start a new section
+SECTION_HEADINGS = {
+    'summary', 'profile', 'professional summary', 'career objective', 'objective',
+    'about me', 'experience', 'work experience', 'professional experience',
+    'employment history', 'education', 'academic qualifications', 'skills',
+    'technical skills', 'core competencies', 'projects', 'certifications',
+    'achievements', 'awards', 'publications', 'languages', 'interests',
+    'extracurricular activities', 'extra curricular activities',
+    'extra-curricular activities', 'volunteering', 'references', 'referees',
+    'non related referees', 'non-related referees', 'contact', 'soft skills',
+    'non technical skills', 'non-technical skills', 'programming languages',
+    'achievements & participations'
+}
+
+STOPWORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'find', 'for', 'from', 'has',
+    'have', 'in', 'is', 'me', 'of', 'on', 'or', 'show', 'some', 'someone', 'that',
+    'the', 'to', 'who', 'with', 'years', 'year', 'experience', 'candidate',
+    'candidates', 'developer', 'developers', 'engineer', 'engineers', 'looking', 'need'
+}
+
+# (start, end, page, section) with character offsets into the resume text
+Passage = Tuple[int, int, int, str]
+
+
+def _section_heading(line: str) -> str:
+    """Return the normalized section name if the line is a known heading, else ''
+
+    Only SECTION_HEADINGS count, so the set of section labels stays small and
+    lines such as an all-caps candidate name are not mistaken for headings.
+    """
+    lowered = line.strip().rstrip(':').strip().lower()
+    return lowered if lowered in SECTION_HEADINGS else ''
+
+
+def split_passages(pages: List[str], max_chars: int = 300) -> List[Passage]:
+    """Split page texts (joined with newlines) into page- and section-aligned passages"""
+    passages: List[Passage] = []
+    section = 'profile'
+    page_offset = 0
+    for page_no, page_text in enumerate(pages, start=1):
+        start = end = None
+        for match in re.finditer(r'[^\n]+', page_text):
+            line_start = page_offset + match.start()
+            line_end = page_offset + match.end()
+            heading = _section_heading(match.group())
+            if heading:
+                if start is not None:
+                    passages.append((start, end, page_no, section))
+                section = heading
+                start = end = None
+                continue
+            if start is not None and line_end - start > max_chars:
+                passages.append((start, end, page_no, section))
+                start = None
+            if start is None:
+                start = line_start
+            end = line_end
+        if start is not None:
+            passages.append((start, end, page_no, section))
+        page_offset += len(page_text) + 1
+    return passages
+
+
+def query_terms(query: str) -> List[str]:
+    """Lowercased query keywords worth highlighting"""
+    terms = []
+    for token in re.findall(r'[a-z0-9][a-z0-9+#.]*', query.lower()):
+        token = token.rstrip('.')
+        if len(token) > 1 and token not in STOPWORDS and token not in terms:
+            terms.append(token)
+    return terms
+
+
+def _find_terms(text: str, terms: List[str]) -> List[Tuple[int, int, str]]:
+    hits = []
+    for term in terms:
+        pattern = r'(?<![a-z0-9])' + re.escape(term) + r'(?![a-z0-9])'
+        for match in re.finditer(pattern, text, flags=re.IGNORECASE):
+            hits.append((match.start(), match.end(), term))
+    hits.sort()
+    # Drop hits nested in an earlier one (e.g. "js" inside "node.js")
+    merged: List[Tuple[int, int, str]] = []
+    for hit in hits:
+        if merged and hit[0] < merged[-1][1]:
+            continue
+        merged.append(hit)
+    return merged
+
+
+def top_snippets(
+    passages: List[Tuple[str, int, str]],
+    terms: List[str],
+    limit: int = 3
+) -> List[Dict]:
+    """Pick the highest-scoring (text, page, section) passages for the query terms"""
+    scored = []
+    for position, (text, page, section) in enumerate(passages):
+        hits = _find_terms(text, terms)
+        if not hits:
+            continue
+        distinct = len({term for _, _, term in hits})
+        score = distinct + 0.1 * len(hits)
+        scored.append((score, position, text, page, section, hits))
+
+    scored.sort(key=lambda item: (-item[0], item[1]))
+    snippets = []
+    seen = set()
+    for score, _, text, page, section, hits in scored:
+        if len(snippets) >= limit:
+            break
+        # Resumes often repeat lines (headers, skill lists) across pages
+        if text in seen:
+            continue
+        seen.add(text)
+        snippets.append({
+            'text': text,
+            'page': page,
+            'section': section,
+            'score': round(score, 2),
+            'highlights': [[start, end] for start, end, _ in hits]
+        })
+    return snippets
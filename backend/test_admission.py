@@ -0,0 +1,160 @@
+import asyncio
+import threading
+import types
+
+import pytest
+
+import admission
+from admission import AdmissionController, DeadlineExceeded, Overloaded
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+async def hold_worker(controller: AdmissionController, release: threading.Event) -> asyncio.Task:
+    """Occupy one worker until release is set"""
+    task = asyncio.create_task(controller.run(release.wait, deadline=controller.deadline(10000)))
+    await asyncio.sleep(0.01)
+    return task
+
+
+def test_overloaded_once_workers_and_queue_are_full():
+    async def scenario():
+        controller = AdmissionController(max_workers=1, max_queue=1)
+        release = threading.Event()
+        running = await hold_worker(controller, release)
+        queued = asyncio.create_task(controller.run(lambda: "queued", deadline=controller.deadline(10000)))
+        await asyncio.sleep(0.01)
+        with pytest.raises(Overloaded) as shed:
+            await controller.run(lambda: "shed")
+        assert shed.value.retry_after >= 1
+        release.set()
+        assert await queued == "queued"
+        await running
+        assert controller._free_slots == 1
+
+    run(scenario())
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    async def scenario():
+        controller = AdmissionController(max_workers=1, max_queue=4)
+        release = threading.Event()
+        running = await hold_worker(controller, release)
+        first = asyncio.create_task(controller._acquire(admission.PRIORITY_INTERACTIVE))
+        second = asyncio.create_task(controller._acquire(admission.PRIORITY_INTERACTIVE))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        await asyncio.sleep(0.01)
+        assert len(controller._waiters) == 1
+        release.set()
+        await running
+        await asyncio.wait_for(second, 1)
+        controller._release()
+        assert controller._free_slots == 1
+
+    run(scenario())
+
+
+def test_slot_handed_to_cancelled_waiter_is_passed_on():
+    async def scenario():
+        controller = AdmissionController(max_workers=1, max_queue=4)
+        await controller._acquire(admission.PRIORITY_INTERACTIVE)
+        first = asyncio.create_task(controller._acquire(admission.PRIORITY_INTERACTIVE))
+        second = asyncio.create_task(controller._acquire(admission.PRIORITY_INTERACTIVE))
+        await asyncio.sleep(0.01)
+        # Hand the slot to the first waiter, then cancel it before it wakes up
+        controller._release()
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        await asyncio.wait_for(second, 1)
+        controller._release()
+        assert controller._free_slots == 1
+        assert not controller._waiters
+
+    run(scenario())
+
+
+def test_background_job_ages_ahead_of_later_searches():
+    async def scenario():
+        controller = AdmissionController(max_workers=1, max_queue=4, background_max_wait_s=0.05)
+        release = threading.Event()
+        order = []
+        running = await hold_worker(controller, release)
+        background = asyncio.create_task(controller.run_background(order.append, "background"))
+        await asyncio.sleep(0.1)
+        search = asyncio.create_task(
+            controller.run(order.append, "search", deadline=controller.deadline(10000))
+        )
+        await asyncio.sleep(0.01)
+        release.set()
+        await asyncio.gather(running, background, search)
+        assert order == ["background", "search"]
+
+    run(scenario())
+
+
+def test_background_job_waits_for_searches_before_aging():
+    async def scenario():
+        controller = AdmissionController(max_workers=1, max_queue=4, background_max_wait_s=10)
+        release = threading.Event()
+        order = []
+        running = await hold_worker(controller, release)
+        background = asyncio.create_task(controller.run_background(order.append, "background"))
+        await asyncio.sleep(0.01)
+        search = asyncio.create_task(
+            controller.run(order.append, "search", deadline=controller.deadline(10000))
+        )
+        await asyncio.sleep(0.01)
+        release.set()
+        await asyncio.gather(running, background, search)
+        assert order == ["search", "background"]
+
+    run(scenario())
+
+
+def test_worker_obtained_after_deadline_is_released(monkeypatch):
+    # First reading is taken before queueing, the second once a worker is held
+    readings = iter([0.0, 10.0])
+    monkeypatch.setattr(admission, "time", types.SimpleNamespace(monotonic=lambda: next(readings)))
+    calls = []
+
+    async def scenario():
+        controller = AdmissionController(max_workers=1, max_queue=4)
+        with pytest.raises(DeadlineExceeded):
+            await controller.run(calls.append, "late", deadline=5.0)
+        assert controller._free_slots == 1
+        assert controller._inflight == 0
+
+    run(scenario())
+    assert calls == []
+
+
+def test_deadline_includes_time_spent_queueing():
+    async def scenario():
+        controller = AdmissionController(max_workers=1, max_queue=4)
+        release = threading.Event()
+        running = await hold_worker(controller, release)
+        with pytest.raises(DeadlineExceeded):
+            await controller.run(lambda: "late", deadline=controller.deadline(50))
+        assert controller._inflight == 1
+        release.set()
+        await running
+        assert controller._free_slots == 1
+
+    run(scenario())
+
+
+def test_timeout_raised_by_fn_is_a_deadline_miss():
+    def gives_up():
+        raise TimeoutError("Search deadline exceeded")
+
+    async def scenario():
+        controller = AdmissionController(max_workers=1, max_queue=4)
+        with pytest.raises(DeadlineExceeded):
+            await controller.run(gives_up, deadline=controller.deadline(1000))
+        assert controller._free_slots == 1
+
+    run(scenario())
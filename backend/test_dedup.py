@@ -0,0 +1,69 @@
+import numpy as np
+
+from dedup import DuplicateDetector
+
+BASE = (
+    "Senior software engineer with six years building payment services in Python "
+    "and Go. Led migration of the ledger to PostgreSQL, designed REST APIs used by "
+    "forty partner banks, mentored four engineers and ran weekly architecture reviews. "
+    "Deployed services on Kubernetes with Terraform and improved p99 latency by half."
+)
+UNRELATED = (
+    "Associate quality assurance engineer experienced in manual and automated testing "
+    "with Selenium, Cucumber and Postman. Wrote regression suites for a hotel booking "
+    "platform, tracked defects in Jira and took part in sprint planning and demos."
+)
+REWORDED = (
+    "QA engineer who moved from backend development. Tested payment APIs with Postman "
+    "and pytest, automated smoke checks in CI, and reported defects in Jira for a "
+    "banking integration team."
+)
+
+
+def unit_vectors(*angles):
+    """2-d unit embeddings at the given angles (radians)"""
+    return np.array([[np.cos(a), np.sin(a)] for a in angles], dtype=np.float32)
+
+
+def test_near_identical_texts_merge():
+    texts = [BASE, BASE.replace("six years", "seven years"), UNRELATED]
+    # Embeddings far apart: the shingle overlap alone must merge the first two
+    clusters = DuplicateDetector().cluster(texts, unit_vectors(0.0, 1.5, 3.0))
+    assert clusters.tolist() == [0, 0, 2]
+
+
+def test_unrelated_texts_with_similar_embeddings_do_not_merge():
+    texts = [BASE, UNRELATED]
+    clusters = DuplicateDetector().cluster(texts, unit_vectors(0.0, 0.05))
+    assert clusters.tolist() == [0, 1]
+
+
+def test_same_email_with_similar_embeddings_merges():
+    texts = [BASE, REWORDED, UNRELATED]
+    emails = ["dev@example.com", "DEV@example.com", "qa@example.com"]
+    detector = DuplicateDetector(email_embedding_threshold=0.8)
+    clusters = detector.cluster(texts, unit_vectors(0.0, 0.6, 0.0), emails)
+    assert clusters.tolist() == [0, 0, 2]
+
+
+def test_same_email_rule_is_off_until_calibrated():
+    texts = [BASE, REWORDED]
+    emails = ["dev@example.com", "dev@example.com"]
+    clusters = DuplicateDetector().cluster(texts, unit_vectors(0.0, 0.1), emails)
+    assert clusters.tolist() == [0, 1]
+
+
+def test_same_email_with_dissimilar_embeddings_does_not_merge():
+    texts = [BASE, UNRELATED]
+    emails = ["shared@example.com", "shared@example.com"]
+    detector = DuplicateDetector(email_embedding_threshold=0.8)
+    clusters = detector.cluster(texts, unit_vectors(0.0, 1.5), emails)
+    assert clusters.tolist() == [0, 1]
+
+
+def test_cluster_is_deterministic():
+    texts = [BASE, BASE + " Certified Kubernetes administrator.", UNRELATED]
+    embeddings = unit_vectors(0.0, 0.1, 2.0)
+    first = DuplicateDetector().cluster(texts, embeddings)
+    second = DuplicateDetector().cluster(texts, embeddings)
+    assert first.tolist() == second.tolist() == [0, 0, 2]
@@ -0,0 +1,62 @@
+import time
+
+from reranker import CrossEncoderReranker
+
+
+class SlowModel:
+    """Stands in for CrossEncoder: sleeps per pair, scores by shared words"""
+
+    def __init__(self, pair_ms: float):
+        self.pair_ms = pair_ms
+        self.batches = []
+
+    def predict(self, pairs, batch_size=32):
+        self.batches.append(len(pairs))
+        time.sleep(self.pair_ms * len(pairs) / 1000)
+        return [float(len(set(q.split()) & set(d.split()))) for q, d in pairs]
+
+
+def make_reranker(pair_ms: float) -> CrossEncoderReranker:
+    reranker = CrossEncoderReranker(chunk_words=4)
+    reranker._model = SlowModel(pair_ms)
+    reranker._pair_ms = pair_ms
+    return reranker
+
+
+def test_scores_every_text_without_budget():
+    reranker = make_reranker(0.1)
+    texts = ["python django react", "java spring", "react native mobile react"]
+    assert reranker.rerank("react python", texts) == [2.0, 0.0, 1.0]
+
+
+def test_unloaded_model_is_not_loaded_on_demand():
+    reranker = CrossEncoderReranker()
+    assert reranker.rerank("react", ["react developer"], latency_budget_ms=1000) is None
+    assert not reranker.is_loaded
+
+
+def test_budget_smaller_than_one_pair_runs_nothing():
+    reranker = make_reranker(20)
+    started = time.perf_counter()
+    assert reranker.rerank("react", ["react dev"] * 16, latency_budget_ms=5) is None
+    assert (time.perf_counter() - started) * 1000 < 5
+    assert reranker._model.batches == []
+
+
+def test_batches_shrink_to_remaining_budget():
+    reranker = make_reranker(10)
+    texts = [f"react developer {i}" for i in range(16)]
+    started = time.perf_counter()
+    assert reranker.rerank("react", texts, latency_budget_ms=45) is None
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    # Four pairs fit; a full batch of 16 would have taken 160 ms
+    assert reranker._model.batches[0] == 4
+    assert elapsed_ms < 80
+    # Pairs scored before the budget ran out are cached for the next request
+    assert reranker._cache_get(("react", texts[0])) == 1.0
+
+
+def test_latency_estimate_tracks_model():
+    reranker = make_reranker(1)
+    reranker.rerank("react", [f"react {i}" for i in range(8)])
+    assert reranker._pair_ms > 1
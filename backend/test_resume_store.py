@@ -0,0 +1,89 @@
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+from resume_store import ResumeStore
+from snippets import split_passages
+
+SKILLS = ['python', 'java', 'react']
+
+
+def resume_info(i: int) -> dict:
+    return {
+        'name': f"Candidate {i}",
+        'email': f"candidate{i}@example.com",
+        'phone': None,
+        'skills': ['python', 'react'] if i % 2 else ['java'],
+        'experience_summary': f"{i} years of experience",
+        'full_text': f"Resume {i} " + "tested services " * (i % 50)
+    }
+
+
+def build_store(count: int) -> ResumeStore:
+    store = ResumeStore(SKILLS)
+    for i in range(count):
+        store.append(f"/resumes/Candidate_{i}.pdf", resume_info(i))
+    return store
+
+
+def test_records_round_trip():
+    store = build_store(3)
+    record = store[1]
+    assert record['id'] == "Candidate_1"
+    assert record['path'].endswith("Candidate_1.pdf")
+    assert record['skills'] == ['python', 'react']
+    assert record['full_text'] == resume_info(1)['full_text']
+    assert store.index_of("Candidate_2") == 2
+    store.close()
+
+
+def test_passages_of_multibyte_text():
+    pages = [
+        "José Muñoz\nExperience\nDiseñó APIs de pagos in Python for señor café",
+        "Education\nMSc Ingeniería, Universidad de Córdoba\nSkills\nPython, añejo ñandú",
+    ]
+    text = "\n".join(pages)
+    passages = split_passages(pages)
+    store = ResumeStore(SKILLS)
+    # A first resume moves the second one's blob offsets past zero
+    store.append("/resumes/Other.pdf", resume_info(1), split_passages([resume_info(1)['full_text']]))
+    idx = store.append("/resumes/Jose.pdf", {**resume_info(2), 'full_text': text}, passages)
+    assert store.get_passages(idx) == [
+        (text[start:end], page, section) for start, end, page, section in passages
+    ]
+    assert [page for _, page, _ in store.get_passages(idx)] == [1, 1, 2, 2]
+    assert store.get_text(idx) == text
+    store.close()
+
+
+def test_replaced_store_is_freed_after_last_reader():
+    store = build_store(3)
+    store.seal()
+    blob = weakref.ref(store._blob)
+    # A search that snapshotted the store before a re-index swapped it out
+    record = store[1]
+    del store
+    assert record['full_text'] == resume_info(1)['full_text']
+    assert blob() is not None
+    del record
+    assert blob() is None
+
+
+def test_concurrent_get_text_maps_the_blob_safely():
+    # Without seal() every reader races to map the blob on first access
+    expected = [resume_info(i)['full_text'] for i in range(200)]
+    for sealed in (False, True):
+        for _ in range(200):
+            store = build_store(200)
+            if sealed:
+                store.seal()
+            start = threading.Barrier(8)
+
+            def read_all(_):
+                start.wait()
+                return [store.get_text(i) for i in range(200)]
+
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                results = list(pool.map(read_all, range(8)))
+            assert all(texts == expected for texts in results)
+            store.close()
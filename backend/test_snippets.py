@@ -0,0 +1,55 @@
+from snippets import query_terms, split_passages, top_snippets
+
+PAGES = [
+    "JOHN SMITH\nSenior Engineer\nSkills\nPython, React and Node.js\nExperience\nBuilt payment APIs in Python",
+    "Education\nBSc in Computer Science\nReferees\nJane Doe, Professor",
+]
+
+
+def passage_texts(pages, **kwargs):
+    text = "\n".join(pages)
+    return [(text[start:end], page, section) for start, end, page, section in split_passages(pages, **kwargs)]
+
+
+def test_passages_follow_headings_and_pages():
+    assert passage_texts(PAGES) == [
+        ("JOHN SMITH\nSenior Engineer", 1, 'profile'),
+        ("Python, React and Node.js", 1, 'skills'),
+        ("Built payment APIs in Python", 1, 'experience'),
+        ("BSc in Computer Science", 2, 'education'),
+        ("Jane Doe, Professor", 2, 'referees'),
+    ]
+
+
+def test_all_caps_lines_are_not_headings():
+    # The candidate name above must stay in the profile section
+    assert passage_texts(["JOHN SMITH\nQA ENGINEER"]) == [("JOHN SMITH\nQA ENGINEER", 1, 'profile')]
+
+
+def test_long_sections_are_split():
+    lines = [f"Line {i} of a long experience section" for i in range(10)]
+    passages = passage_texts(["Experience\n" + "\n".join(lines)], max_chars=100)
+    assert len(passages) > 1
+    assert all(len(text) <= 100 for text, _, _ in passages)
+    assert "\n".join(text for text, _, _ in passages) == "\n".join(lines)
+
+
+def test_query_terms_drop_stopwords():
+    assert query_terms("Find React developers with Node.js and C++") == ['react', 'node.js', 'c++']
+
+
+def test_top_snippets_rank_by_distinct_terms():
+    passages = [
+        ("Python scripting", 1, 'skills'),
+        ("Built React apps with a Python backend", 1, 'experience'),
+        ("Python scripting", 2, 'skills'),
+    ]
+    snippets = top_snippets(passages, ['python', 'react'], limit=3)
+    assert [s['text'] for s in snippets] == ["Built React apps with a Python backend", "Python scripting"]
+    assert snippets[0]['highlights'] == [[6, 11], [24, 30]]
+    assert snippets[0]['section'] == 'experience'
+
+
+def test_nested_terms_are_highlighted_once():
+    snippets = top_snippets([("Node.js services", 1, 'skills')], ['node.js', 'js'])
+    assert snippets[0]['highlights'] == [[0, 7]]